@@ -2,13 +2,25 @@
 Centralized logging configuration for spotifyToYT project.
 Provides consistent logging across all scripts with thread-safe operations.
 """
+import atexit
+import functools
+import io
 import logging
+import logging.handlers
+import queue
 import threading
 import time
 import sys
 import os
 from pathlib import Path
 
+# Our formatters never use %(thread)s/%(process)s/%(processName)s/%(taskName)s,
+# so skip collecting them when each LogRecord is built
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.logAsyncioTasks = False  # Python 3.12+; harmless on older versions
+
 # Thread-safe print lock for legacy compatibility
 print_lock = threading.Lock()
 
@@ -16,20 +28,267 @@ print_lock = threading.Lock()
 CURRENT_LOG_LEVEL = "INFO"
 CURRENT_QUIET = False
 
+# Upper bound on records waiting for the listener thread
+_LOG_QUEUE_SIZE = 10_000
+
+# Active QueueListener per script name, so reconfiguring stops the old one
+_LISTENERS = {}
+
+# script_name -> ((script_name, level, quiet, file_level), logger) for configured loggers
+_CONFIGURED = {}
+
+# name -> logger for every logger handed out by get_logger or setup_logging
+_LOGGER_CACHE = {}
+
+# Directory for log files, created on first use
+_LOG_DIR = Path("logs")
+_LOGDIR_READY = False
+
+def _ensure_logdir():
+    """Create the logs directory once per process"""
+    global _LOGDIR_READY
+    if _LOGDIR_READY:
+        return
+    _LOG_DIR.mkdir(exist_ok=True)
+    _LOGDIR_READY = True
+
+# Level name -> numeric level, filled in as setup_logging sees new names
+_LEVEL_CACHE = {}
+
+def _resolve_level(name: str) -> int:
+    """Resolve a level name such as "info" or "DEBUG" to its numeric value"""
+    level = _LEVEL_CACHE.get(name)
+    if level is None:
+        level = getattr(logging, name.upper(), None)
+        if not isinstance(level, int):
+            raise ValueError(f"Invalid log level: {name}")
+        _LEVEL_CACHE[name] = level
+    return level
+
+threading.main_thread()._cached_log_id = "MAIN"
+
+def init_thread_log_id():
+    """
+    Compute the calling thread's short log ID up front, so its first log call
+    doesn't have to (e.g. as a ThreadPoolExecutor initializer).
+    """
+    thread = threading.current_thread()
+    thread._cached_log_id = f"T{thread.ident % 1000}"
+
+class LoggingThread(threading.Thread):
+    """Thread that computes its short log ID once, when it starts running"""
+    
+    def run(self):
+        init_thread_log_id()
+        super().run()
+
+def _tag_thread(record):
+    """Stamp the short ID of the calling thread onto a record"""
+    # The ID is cached on the Thread object; plain threads get it on first log
+    thread = threading.current_thread()
+    thread_id = getattr(thread, '_cached_log_id', None)
+    if thread_id is None:
+        thread_id = f"T{thread.ident % 1000}"  # Short thread ID
+        thread._cached_log_id = thread_id
+    record.thread_id = thread_id
+
 class ThreadSafeFormatter(logging.Formatter):
     """Thread-safe formatter that includes thread ID"""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The template is fixed, so scan it for %(asctime) once, not per record
+        self._uses_time = super().usesTime()
+        # (second, formatted string) of the last timestamp, swapped atomically
+        self._last_time = (-1, "")
+    
     def format(self, record):
-        # Add thread ID to the record
-        if threading.current_thread() != threading.main_thread():
-            thread_id = threading.get_ident() % 1000  # Short thread ID
-            record.thread_id = f"T{thread_id}"
-        else:
-            record.thread_id = "MAIN"
+        # Records coming off the queue were already tagged by the emitting thread
+        if not hasattr(record, 'thread_id'):
+            _tag_thread(record)
         
         return super().format(record)
+    
+    def usesTime(self):
+        return self._uses_time
+    
+    def formatTime(self, record, datefmt=None):
+        # Only whole-second formats can be reused across records
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        last_second, last_str = self._last_time
+        if second != last_second:
+            last_str = time.strftime(datefmt, self.converter(second))
+            self._last_time = (second, last_str)
+        return last_str
+
+class DetailedFormatter(ThreadSafeFormatter):
+    """
+    ThreadSafeFormatter with the detailed file layout built directly,
+    skipping %-template substitution on every record.
+    """
+    
+    def __init__(self, datefmt='%H:%M:%S'):
+        # fmt must match formatMessage below; usesTime() keys off it
+        super().__init__(
+            fmt='[%(asctime)s] [%(levelname)s] [%(thread_id)s] %(name)s: %(message)s',
+            datefmt=datefmt
+        )
+    
+    def formatMessage(self, record):
+        return f"[{record.asctime}] [{record.levelname}] [{record.thread_id}] {record.name}: {record.message}"
+
+class _SuccessFilter(logging.Filter):
+    """Prefix records logged via LoggerAdapter.success with a check mark"""
+    
+    def filter(self, record):
+        # Pop the flag so the prefix is applied once even when several
+        # handlers share this record
+        if record.__dict__.pop('success', False):
+            record.msg = "✓ " + str(record.msg)
+        return True
+
+class ThreadTaggingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that records the emitting thread before handing off.
+    
+    The queue is bounded: when it is full, WARNING and above are written
+    synchronously to `handlers` so they are never lost. Lower levels evict
+    the oldest queued record if it is below WARNING, and are otherwise
+    written synchronously as well.
+    """
+    
+    def __init__(self, log_queue, handlers=()):
+        super().__init__(log_queue)
+        self.handlers = handlers
+    
+    def prepare(self, record):
+        _tag_thread(record)
+        return super().prepare(record)
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        
+        if record.levelno < logging.WARNING and self._replace_oldest(record):
+            return
+        
+        # WARNING and above, or nothing evictable at the head of the queue
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    
+    def _replace_oldest(self, record):
+        """Swap the oldest queued record for `record` if it is below WARNING"""
+        q = self.queue
+        with q.mutex:
+            if q.queue:
+                oldest = q.queue[0]
+                if not isinstance(oldest, logging.LogRecord) or oldest.levelno >= logging.WARNING:
+                    return False
+                # Same length, so no waiter needs waking and task counts stay balanced
+                q.queue.popleft()
+                q.queue.append(record)
+                return True
+        
+        # The listener drained the queue since put_nowait failed
+        try:
+            q.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
 
-def setup_logging(script_name: str, level: str = "INFO", quiet: bool = False):
+class _LogQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener whose stop() waits for room instead of failing on a full
+    queue, and which flushes its handlers whenever the queue goes idle.
+    """
+    
+    # Seconds with no new records before buffered handlers are flushed
+    idle_flush_interval = 1.0
+    
+    def dequeue(self, block):
+        if not block:
+            return self.queue.get_nowait()
+        # Without this, lines buffered by BufferedFileHandler would sit in memory
+        # until the next record arrives, e.g. for the length of a long upload
+        while True:
+            try:
+                return self.queue.get(timeout=self.idle_flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+    
+    def enqueue_sentinel(self):
+        # The listener thread keeps draining, so a blocking put always completes
+        self.queue.put(self._sentinel)
+
+class BufferedFileHandler(logging.StreamHandler):
+    """
+    File handler that batches writes through a large userspace buffer.
+    
+    The buffer is flushed on WARNING and above, every `flush_every` records,
+    once `flush_interval` seconds have passed since the last flush, and on close.
+    When fed by the queue listener it is also flushed once the queue goes idle.
+    """
+    
+    def __init__(self, filename, encoding='utf-8', buffer_size=65536,
+                 flush_every=100, flush_interval=1.0):
+        raw = open(filename, 'ab', buffering=0)
+        buffered = io.BufferedWriter(raw, buffer_size=buffer_size)
+        stream = io.TextIOWrapper(buffered, encoding=encoding, write_through=False)
+        super().__init__(stream)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+    
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+            self.stream.write(msg + self.terminator)
+            self._pending += 1
+            now = time.monotonic()
+            if (record.levelno >= logging.WARNING
+                    or self._pending >= self.flush_every
+                    or now - self._last_flush >= self.flush_interval):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        self.acquire()
+        try:
+            if self.stream and not self.stream.closed:
+                self.stream.flush()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+    
+    def close(self):
+        self.acquire()
+        try:
+            try:
+                self.flush()
+            finally:
+                stream = self.stream
+                self.stream = None
+                if stream is not None:
+                    stream.close()
+                super().close()
+        finally:
+            self.release()
+
+def setup_logging(script_name: str, level: str = "INFO", quiet: bool = False,
+                  file_level: str = None):
     """
     Setup centralized logging for a script.
     
@@ -37,73 +296,112 @@ def setup_logging(script_name: str, level: str = "INFO", quiet: bool = False):
         script_name: Name of the script (e.g., "spoty_exporter")
         level: Logging level ("DEBUG", "INFO", "WARNING", "ERROR")
         quiet: If True, only log WARNING and above to console
+        file_level: Logging level for the log file. If None, uses level
     
     Returns:
         logger: Configured logger instance
     """
     global CURRENT_LOG_LEVEL, CURRENT_QUIET
     
+    # Validate the level before touching any global state
+    level_no = _resolve_level(level)
+    file_level_no = _resolve_level(file_level) if file_level else level_no
+    
     # Store current configuration for library functions
     CURRENT_LOG_LEVEL = level
     CURRENT_QUIET = quiet
     
+    # Nothing to do if this logger is already set up with the same options
+    key = (script_name, level, quiet, file_level)
+    cached = _CONFIGURED.get(script_name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
     # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+    _ensure_logdir()
+    
+    console_level_no = logging.WARNING if quiet else level_no
     
-    # Create logger
+    # Create logger; records below every handler's level are dropped here,
+    # before a LogRecord is even built
     logger = logging.getLogger(script_name)
-    logger.setLevel(getattr(logging, level.upper()))
+    logger.setLevel(min(console_level_no, file_level_no))
     
     # Clear existing handlers to avoid duplicates
     logger.handlers.clear()
     
     # Create formatters
-    detailed_formatter = ThreadSafeFormatter(
-        fmt='[%(asctime)s] [%(levelname)s] [%(thread_id)s] %(name)s: %(message)s',
-        datefmt='%H:%M:%S'
-    )
+    detailed_formatter = DetailedFormatter(datefmt='%H:%M:%S')
     
     simple_formatter = ThreadSafeFormatter(
         fmt='[%(levelname)s] %(message)s'
     )
     
+    success_filter = _SuccessFilter()
+    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    if quiet:
-        console_handler.setLevel(logging.WARNING)
-    else:
-        # Respect the main script's log level for console output
-        console_handler.setLevel(getattr(logging, level.upper()))
+    # WARNING+ when quiet, otherwise respect the main script's log level
+    console_handler.setLevel(console_level_no)
     console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
+    console_handler.addFilter(success_filter)
     
     # File handler for detailed logs
-    log_file = log_dir / f"{script_name}.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
+    log_file = _LOG_DIR / f"{script_name}.log"
+    file_handler = BufferedFileHandler(log_file, encoding='utf-8')
+    file_handler.setLevel(file_level_no)
     file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
+    file_handler.addFilter(success_filter)
+    
+    # Route records through a queue so callers never block on console/disk I/O;
+    # the real handlers run on the listener's background thread
+    previous = _LISTENERS.pop(script_name, None)
+    if previous is not None:
+        previous.stop()
+        for handler in previous.handlers:
+            handler.close()
+    
+    log_queue = queue.Queue(maxsize=_LOG_QUEUE_SIZE)
+    logger.addHandler(
+        ThreadTaggingQueueHandler(log_queue, handlers=(console_handler, file_handler))
+    )
+    
+    listener = _LogQueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    _LISTENERS[script_name] = listener
     
     # Add a filter to prevent duplicate logs from propagating
     logger.propagate = False
     
+    _CONFIGURED[script_name] = (key, logger)
+    _LOGGER_CACHE[script_name] = logger
     return logger
 
-def get_logger(name: str = None) -> logging.Logger:
+@atexit.register
+def _stop_listeners():
+    """Flush queued records and stop all listener threads at interpreter exit"""
+    for listener in list(_LISTENERS.values()):
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+    _LISTENERS.clear()
+
+def get_logger(name: str) -> logging.Logger:
     """
     Get an existing logger that inherits the current log level from main script.
     
     Args:
-        name: Logger name. If None, uses the calling module name
+        name: Logger name
     
     Returns:
         logger: Logger instance with same level as main script
     """
-    if name is None:
-        # Try to determine caller's module name
-        frame = sys._getframe(1)
-        name = Path(frame.f_globals.get('__file__', 'unknown')).stem
+    # Fast path: skip logging.getLogger and its module-wide lock
+    logger = _LOGGER_CACHE.get(name)
+    if logger is not None:
+        return logger
     
     logger = logging.getLogger(name)
     
@@ -111,76 +409,159 @@ def get_logger(name: str = None) -> logging.Logger:
     if not logger.handlers:
         logger = setup_logging(name, level=CURRENT_LOG_LEVEL, quiet=CURRENT_QUIET)
     
+    _LOGGER_CACHE[name] = logger
     return logger
 
+@functools.lru_cache(maxsize=256)
+def _name_for_file(filename: str) -> str:
+    """Resolve a module file path to its logger name"""
+    return Path(filename).stem
+
+def get_logger_auto() -> logging.Logger:
+    """
+    Get a logger named after the calling module.
+    
+    Kept for backwards compatibility with callers that relied on
+    get_logger() inferring the name; prefer passing a name explicitly.
+    """
+    frame = sys._getframe(1)
+    return get_logger(_name_for_file(frame.f_globals.get('__file__', 'unknown')))
+
 def thread_safe_print(message: str):
     """
     Thread-safe print function for legacy compatibility.
     Use logger.info() instead when possible.
     """
+    # One write per message so the text and newline can't be split
+    line = message + "\n"
     with print_lock:
-        print(message)
+        sys.stdout.write(line)
 
-class LoggerAdapter:
+class LoggerAdapter(logging.LoggerAdapter):
     """
     Adapter to make transitioning from print/debug_log easier.
     Provides familiar method names while using proper logging.
     """
     
-    def __init__(self, logger_name: str):
-        self.logger = get_logger(logger_name)
-    
-    def info(self, message: str):
-        """Log info message"""
-        self.logger.info(message)
+    # Legacy level names accepted by debug_log, mapped to method names
+    _LEVEL_METHODS = {
+        "INFO": "info",
+        "DEBUG": "debug",
+        "WARNING": "warning",
+        "ERROR": "error",
+        "WARN": "warning"
+    }
     
-    def debug(self, message: str):
-        """Log debug message"""
-        self.logger.debug(message)
-    
-    def warning(self, message: str):
-        """Log warning message"""
-        self.logger.warning(message)
-    
-    def error(self, message: str):
-        """Log error message"""
-        self.logger.error(message)
+    def __init__(self, logger_name: str):
+        super().__init__(get_logger(logger_name), {})
+        
+        # Bind the plain level methods straight to the logger so each call
+        # skips the adapter's process()/log() indirection
+        self.info = self.logger.info
+        self.debug = self.logger.debug
+        self.warning = self.logger.warning
+        self.error = self.logger.error
     
     def success(self, message: str):
         """Log success message (as info with prefix)"""
-        self.logger.info(f"✓ {message}")
+        # The prefix is added by _SuccessFilter, only if a handler emits it
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, extra={'success': True})
     
     def progress(self, current: int, total: int, message: str = ""):
         """Log progress message"""
         if message:
-            self.logger.info(f"[{current}/{total}] {message}")
+            self.log_if(logging.INFO, "[%s/%s] %s", current, total, message)
         else:
-            self.logger.info(f"Progress: {current}/{total}")
+            self.log_if(logging.INFO, "Progress: %s/%s", current, total)
+    
+    def log_if(self, level: int, fmt: str, *args):
+        """
+        Log a %-style message only if the level is enabled.
+        
+        Prefer this over f-strings in hot loops: the arguments are only
+        formatted when a handler actually emits the record.
+        
+        Args:
+            level: Numeric logging level (e.g. logging.DEBUG)
+            fmt: %-style format string
+            *args: Values substituted into fmt
+        """
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, fmt, *args)
     
     # Legacy compatibility methods
     def debug_log(self, message: str, level: str = "INFO"):
         """Legacy compatibility for debug_log function"""
-        level_map = {
-            "INFO": self.info,
-            "DEBUG": self.debug,
-            "WARNING": self.warning,
-            "ERROR": self.error,
-            "WARN": self.warning
-        }
-        log_func = level_map.get(level.upper(), self.info)
-        log_func(message)
+        method_name = self._LEVEL_METHODS.get(level.upper(), "info")
+        getattr(self, method_name)(message)
+
+class AsyncLoggerAdapter:
+    """
+    Awaitable front end to LoggerAdapter for code running on an asyncio loop.
+    Records go to the same QueueHandler as the sync adapter, so console/file
+    I/O normally happens on the listener thread. If the queue is full and no
+    sub-WARNING record can be dropped, WARNING+ records are written
+    synchronously on the calling thread - here, the event loop.
+    """
+    
+    def __init__(self, logger_name: str):
+        self._adapter = LoggerAdapter(logger_name)
+        self.logger = self._adapter.logger
+    
+    async def info(self, message: str, *args):
+        """Log info message"""
+        self._adapter.info(message, *args)
+    
+    async def debug(self, message: str, *args):
+        """Log debug message"""
+        self._adapter.debug(message, *args)
+    
+    async def warning(self, message: str, *args):
+        """Log warning message"""
+        self._adapter.warning(message, *args)
+    
+    async def error(self, message: str, *args):
+        """Log error message"""
+        self._adapter.error(message, *args)
+    
+    async def success(self, message: str):
+        """Log success message (as info with prefix)"""
+        self._adapter.success(message)
+    
+    async def progress(self, current: int, total: int, message: str = ""):
+        """Log progress message"""
+        self._adapter.progress(current, total, message)
 
 # Example usage functions for easy migration
-def create_logger(script_name: str, quiet: bool = False) -> LoggerAdapter:
+def create_logger(script_name: str, quiet: bool = False,
+                  file_level: str = None) -> LoggerAdapter:
     """
     Create a logger adapter for easy migration from print statements.
     
     Args:
         script_name: Name of the script
         quiet: If True, suppress verbose console output
+        file_level: Logging level for the log file. If None, uses INFO
     
     Returns:
         LoggerAdapter: Easy-to-use logger adapter
     """
-    setup_logging(script_name, quiet=quiet)
-    return LoggerAdapter(script_name)
\ No newline at end of file
+    setup_logging(script_name, quiet=quiet, file_level=file_level)
+    return LoggerAdapter(script_name)
+
+def create_async_logger(script_name: str, quiet: bool = False,
+                        file_level: str = None) -> AsyncLoggerAdapter:
+    """
+    Create an awaitable logger adapter for asyncio code.
+    
+    Args:
+        script_name: Name of the script
+        quiet: If True, suppress verbose console output
+        file_level: Logging level for the log file. If None, uses INFO
+    
+    Returns:
+        AsyncLoggerAdapter: Logger adapter whose methods are coroutines
+    """
+    setup_logging(script_name, quiet=quiet, file_level=file_level)
+    return AsyncLoggerAdapter(script_name)
\ No newline at end of file
@@ -7,20 +7,40 @@ Coordinates export from iCloud Photo Library and upload to Immich
 import argparse
 import configparser
 import json
+import logging
 import os
 import signal
 import sqlite3
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import shutil
-import glob
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+
+# orjson parses the Swift binary's JSON (bytes in, no decode step) several
+# times faster than the stdlib; fall back to json if it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson lets list-assets output be parsed while Swift is still writing it;
+# without it the whole array is buffered and parsed in one go
+try:
+    import ijson
+except ImportError:
+    ijson = None
 from rich.console import Console
 from rich.progress import (
     Progress, SpinnerColumn, BarColumn, TextColumn, 
@@ -39,21 +59,99 @@ custom_logging = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(custom_logging)
 
 create_logger = custom_logging.create_logger
+init_thread_log_id = custom_logging.init_thread_log_id
+
+# Hot-path statements, kept as constants so sqlite3's statement cache reuses
+# the compiled form instead of re-preparing them for every asset
+_SQL_INSERT_ASSETS_PREFIX = (
+    "INSERT OR IGNORE INTO assets (asset_id, original_filename, asset_type, creation_date, status) VALUES "
+)
+_SQL_ASSET_ROW = "(?, ?, ?, ?, ?)"
+
+# Rows per multi-row INSERT; SQLite before 3.32 allows only 999 bound parameters
+_INSERT_CHUNK_ROWS = 500 if sqlite3.sqlite_version_info >= (3, 32, 0) else 199
+_SQL_INSERT_ASSETS_CHUNK = _SQL_INSERT_ASSETS_PREFIX + ", ".join([_SQL_ASSET_ROW] * _INSERT_CHUNK_ROWS)
+
+# processed_at is stamped by SQLite in local time, matching datetime.now().isoformat()
+# up to millisecond precision, without allocating a datetime per asset
+_SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+_SQL_MARK_COMPLETED = f"""UPDATE assets SET 
+               status='completed', immich_id=?, file_size=?, upload_bytes=?, upload_duration=?, processed_at={_SQL_NOW}
+               WHERE asset_id=?"""
+_SQL_MARK_FAILED = (
+    f"UPDATE assets SET status='failed', error_message=?, retry_count=retry_count+1, processed_at={_SQL_NOW} "
+    "WHERE asset_id=?"
+)
+_SQL_SET_METADATA = (
+    "INSERT INTO sync_metadata (key, value) VALUES (?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET value=excluded.value"
+)
+_SQL_PENDING_WHERE = "WHERE (status='pending' OR (status='failed' AND retry_count < ?))"
+
+# Rows fetched per round trip when iterating pending assets
+_PENDING_FETCH_SIZE = 500
+
+# Pending assets are paged by (creation_date, asset_id); asset_id breaks ties
+# between assets created in the same instant
+_SQL_PENDING_FIRST_PAGE = (
+    f"SELECT * FROM assets {_SQL_PENDING_WHERE} "
+    f"ORDER BY creation_date, asset_id LIMIT {_PENDING_FETCH_SIZE}"
+)
+_SQL_PENDING_NEXT_PAGE = (
+    f"SELECT * FROM assets {_SQL_PENDING_WHERE} AND (creation_date, asset_id) > (?, ?) "
+    f"ORDER BY creation_date, asset_id LIMIT {_PENDING_FETCH_SIZE}"
+)
+
+# Discovered assets are written to the DB in batches of this size
+_DISCOVERY_BATCH_SIZE = 1000
+
+# Seconds before a Swift binary call is considered hung
+_SWIFT_TIMEOUT = 120
+
+# Minimum seconds between progress-bar description changes
+_PROGRESS_DESC_INTERVAL = 0.25
+
+# Assets between speed recalculations (and speed log lines)
+_SPEED_UPDATE_EVERY = 10
+
+# Seconds between shutdown-flag checks while waiting on workers
+_SHUTDOWN_POLL_INTERVAL = 0.5
+
+# Multiply a byte count by this to get MiB
+_INV_MB = 1.0 / 1048576
 
 
 class StateDB:
-    """SQLite database manager for sync state tracking"""
+    """
+    SQLite database manager for sync state tracking.
+    
+    One connection is shared by all worker threads; every access goes
+    through self.lock so statements and commits never interleave.
+    """
     
     def __init__(self, db_path: Path):
         self.db_path = db_path
         self.conn = None
+        self.lock = threading.Lock()
+        # Metadata writes are coalesced here and upserted on flush()/close()
+        self._pending_meta: Dict[str, str] = {}
         self._init_database()
     
     def _init_database(self):
         """Initialize database with required schema"""
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = sqlite3.connect(
+            str(self.db_path), cached_statements=256, check_same_thread=False
+        )
         self.conn.row_factory = sqlite3.Row
         
+        # WAL + synchronous=NORMAL avoids an fsync of the rollback journal on
+        # every commit; the remaining pragmas keep temp data and hot pages in memory
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        
         # Create tables if they don't exist
         self.conn.executescript("""
             CREATE TABLE IF NOT EXISTS sync_metadata (
@@ -79,103 +177,183 @@ class StateDB:
             
             CREATE INDEX IF NOT EXISTS idx_status ON assets(status);
             CREATE INDEX IF NOT EXISTS idx_retry ON assets(status, retry_count);
+            CREATE INDEX IF NOT EXISTS idx_creation ON assets(creation_date, asset_id);
+            
+            -- Per-status asset counts, kept current by the triggers below so
+            -- get_stats is a point lookup instead of a scan over assets
+            CREATE TABLE IF NOT EXISTS asset_status_counts (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            );
+            
+            CREATE TRIGGER IF NOT EXISTS trg_assets_insert_count AFTER INSERT ON assets
+            BEGIN
+                INSERT INTO asset_status_counts (status, count) VALUES (NEW.status, 1)
+                    ON CONFLICT(status) DO UPDATE SET count = count + 1;
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS trg_assets_update_count AFTER UPDATE OF status ON assets
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE asset_status_counts SET count = count - 1 WHERE status = OLD.status;
+                INSERT INTO asset_status_counts (status, count) VALUES (NEW.status, 1)
+                    ON CONFLICT(status) DO UPDATE SET count = count + 1;
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS trg_assets_delete_count AFTER DELETE ON assets
+            BEGIN
+                UPDATE asset_status_counts SET count = count - 1 WHERE status = OLD.status;
+            END;
         """)
+        
+        # Seed the counts for databases created before the counts table existed
+        has_counts = self.conn.execute("SELECT 1 FROM asset_status_counts LIMIT 1").fetchone()
+        if has_counts is None:
+            self.conn.execute(
+                "INSERT INTO asset_status_counts (status, count) "
+                "SELECT status, COUNT(*) FROM assets GROUP BY status"
+            )
         self.conn.commit()
     
     def add_assets(self, assets: List[Dict]):
         """Bulk insert assets from Swift list-assets response"""
-        assets_data = [
-            (
-                asset['id'],
-                asset.get('original_filename', ''),
-                asset['type'],
-                asset['creation_date'],
-                'pending'
+        # One multi-row INSERT per chunk, all inside a single transaction
+        with self.lock:
+            for start in range(0, len(assets), _INSERT_CHUNK_ROWS):
+                chunk = assets[start:start + _INSERT_CHUNK_ROWS]
+                params = []
+                for asset in chunk:
+                    params.extend((
+                        asset['id'],
+                        asset.get('original_filename', ''),
+                        asset['type'],
+                        asset['creation_date'],
+                        'pending'
+                    ))
+                
+                if len(chunk) == _INSERT_CHUNK_ROWS:
+                    sql = _SQL_INSERT_ASSETS_CHUNK
+                else:
+                    sql = _SQL_INSERT_ASSETS_PREFIX + ", ".join([_SQL_ASSET_ROW] * len(chunk))
+                
+                self.conn.execute(sql, params)
+            
+            self.conn.commit()
+    
+    def count_pending_assets(self, max_retries: int = 3) -> int:
+        """Count assets that need processing"""
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT COUNT(*) FROM assets {_SQL_PENDING_WHERE}", (max_retries,)
             )
-            for asset in assets
-        ]
-        
-        self.conn.executemany(
-            "INSERT OR IGNORE INTO assets (asset_id, original_filename, asset_type, creation_date, status) VALUES (?, ?, ?, ?, ?)",
-            assets_data
-        )
-        self.conn.commit()
+            return cursor.fetchone()[0]
     
-    def get_pending_assets(self, max_retries: int = 3) -> List[sqlite3.Row]:
-        """Get assets that need processing"""
-        cursor = self.conn.execute(
-            "SELECT * FROM assets WHERE status='pending' OR (status='failed' AND retry_count < ?) ORDER BY creation_date ASC",
-            (max_retries,)
-        )
-        return cursor.fetchall()
+    def get_pending_assets(self, max_retries: int = 3) -> Iterator[sqlite3.Row]:
+        """Yield assets that need processing, fetching them in batches"""
+        # Each page is a short query keyed on the last row seen. A single long
+        # cursor would pin a read snapshot for the whole run, which stops WAL
+        # checkpoints from resetting the log while workers commit
+        with self.lock:
+            rows = self.conn.execute(_SQL_PENDING_FIRST_PAGE, (max_retries,)).fetchall()
+        
+        while rows:
+            yield from rows
+            if len(rows) < _PENDING_FETCH_SIZE:
+                break
+            
+            last = rows[-1]
+            with self.lock:
+                rows = self.conn.execute(
+                    _SQL_PENDING_NEXT_PAGE,
+                    (max_retries, last['creation_date'], last['asset_id'])
+                ).fetchall()
     
     def mark_completed(self, asset_id: str, immich_id: str, file_size: int, upload_bytes: int, upload_duration: float):
         """Mark asset as successfully completed"""
-        self.conn.execute(
-            """UPDATE assets SET 
-               status='completed', immich_id=?, file_size=?, upload_bytes=?, upload_duration=?, processed_at=?
-               WHERE asset_id=?""",
-            (immich_id, file_size, upload_bytes, upload_duration, datetime.now().isoformat(), asset_id)
-        )
-        self.conn.commit()
+        with self.lock:
+            self.conn.execute(
+                _SQL_MARK_COMPLETED,
+                (immich_id, file_size, upload_bytes, upload_duration, asset_id)
+            )
     
     def mark_failed(self, asset_id: str, error_message: str):
         """Mark asset as failed and increment retry count"""
-        self.conn.execute(
-            "UPDATE assets SET status='failed', error_message=?, retry_count=retry_count+1, processed_at=? WHERE asset_id=?",
-            (error_message, datetime.now().isoformat(), asset_id)
-        )
-        self.conn.commit()
+        with self.lock:
+            self.conn.execute(
+                _SQL_MARK_FAILED,
+                (error_message, asset_id)
+            )
     
     def get_stats(self) -> Dict[str, int]:
         """Get processing statistics"""
-        cursor = self.conn.execute(
-            "SELECT status, COUNT(*) as count FROM assets GROUP BY status"
-        )
-        stats = {row['status']: row['count'] for row in cursor.fetchall()}
+        with self.lock:
+            cursor = self.conn.execute("SELECT status, count FROM asset_status_counts")
+            stats = {row['status']: row['count'] for row in cursor.fetchall()}
+        
+        stats['total'] = sum(stats.values())
         
         # Ensure all statuses are present
         for status in ['pending', 'completed', 'failed']:
             stats.setdefault(status, 0)
         
-        cursor = self.conn.execute("SELECT COUNT(*) as total FROM assets")
-        stats['total'] = cursor.fetchone()['total']
-        
         return stats
     
     def set_metadata(self, key: str, value: str):
-        """Set metadata value"""
-        self.conn.execute(
-            "INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)",
-            (key, value)
-        )
-        self.conn.commit()
+        """Set metadata value (buffered until the next flush)"""
+        with self.lock:
+            self._pending_meta[key] = value
+    
+    def _write_pending_meta(self):
+        """Upsert buffered metadata into the current transaction (caller holds lock)"""
+        if self._pending_meta:
+            self.conn.executemany(_SQL_SET_METADATA, self._pending_meta.items())
+            self._pending_meta.clear()
     
     def get_metadata(self, key: str) -> Optional[str]:
         """Get metadata value"""
-        cursor = self.conn.execute(
-            "SELECT value FROM sync_metadata WHERE key=?", (key,)
-        )
-        row = cursor.fetchone()
+        with self.lock:
+            if key in self._pending_meta:
+                return self._pending_meta[key]
+            cursor = self.conn.execute(
+                "SELECT value FROM sync_metadata WHERE key=?", (key,)
+            )
+            row = cursor.fetchone()
         return row['value'] if row else None
     
     def backup_database(self) -> Path:
         """Create timestamped backup of database"""
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
         backup_path = self.db_path.parent / f"state_backup_{timestamp}.db"
-        shutil.copy2(self.db_path, backup_path)
         
-        # Keep only last 5 backups
-        backups = sorted(glob.glob(str(self.db_path.parent / 'state_backup_*.db')))
+        # SQLite's online backup API copies a consistent snapshot, including
+        # pages still in the WAL file, a few pages at a time
+        backup_conn = sqlite3.connect(str(backup_path))
+        try:
+            with self.lock:
+                self.conn.backup(backup_conn, pages=100, sleep=0.01)
+        finally:
+            backup_conn.close()
+        
+        # Keep only last 5 backups; the timestamped names sort chronologically
+        backups = sorted(self.db_path.parent.glob('state_backup_*.db'), key=lambda p: p.name)
         for old_backup in backups[:-5]:
-            os.remove(old_backup)
+            old_backup.unlink()
         
         return backup_path
     
+    def flush(self):
+        """Commit pending status and metadata writes"""
+        with self.lock:
+            self._write_pending_meta()
+            self.conn.commit()
+    
     def close(self):
-        """Close database connection"""
+        """Commit pending writes and close database connection"""
         if self.conn:
-            self.conn.close()
+            with self.lock:
+                self._write_pending_meta()
+                self.conn.commit()
+                self.conn.close()
 
 
 class PhotoSyncOrchestrator:
@@ -184,7 +362,9 @@ class PhotoSyncOrchestrator:
     def __init__(self, args):
         self.args = args
         self.config = self._load_config()
+        self._precompute_config()
         self.logger = self._setup_logging()
+        self.session = self._create_session()
         self.db = None
         self.shutdown_requested = False
         
@@ -194,7 +374,9 @@ class PhotoSyncOrchestrator:
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
-        self.logger.info("\n🛑 Shutdown signal received. Finishing current asset...")
+        # Only set the flag: logging takes the log queue's non-reentrant lock,
+        # which the interrupted main thread may already hold. The processing
+        # loop reports the shutdown when it sees the flag
         self.shutdown_requested = True
     
     def _load_config(self) -> configparser.ConfigParser:
@@ -213,20 +395,52 @@ class PhotoSyncOrchestrator:
         
         return config
     
+    def _precompute_config(self):
+        """Parse config and environment values used in the per-asset loop once"""
+        self._api_url = os.getenv("IMMICH_API_URL")
+        self._api_key = os.getenv("IMMICH_API_KEY")
+        self._upload_url = f"{self._api_url}/assets"
+        
+        self._max_retries = int(self.config['retry']['max_retries'])
+        # Delays are configured in milliseconds; keep them in seconds for time.sleep
+        self._retry_delays = tuple(
+            int(x.strip()) / 1000.0 for x in self.config['retry']['retry_delays'].split(',')
+        )
+        self._swift_binary = Path(self.config['paths']['swift_binary'])
+        self._temp_dir = Path(self.config['paths']['temp_dir'])
+        self._upload_timeout = int(self.config['upload']['upload_timeout'])
+        self._progress_update_interval = int(self.config['processing']['progress_update_interval'])
+    
     def _setup_logging(self):
         """Setup logging using our custom logging module"""
         # Determine quiet mode based on log level
         quiet_mode = self.args.log_level.upper() in ['WARNING', 'ERROR']
         
-        # Create logger using our custom module
-        logger = create_logger("photo-sync", quiet=quiet_mode)
+        # Create logger using our custom module; the log file records
+        # everything at the requested level, including DEBUG
+        logger = create_logger("photo-sync", quiet=quiet_mode, file_level=self.args.log_level)
         
         # Set log level on the logger itself
-        import logging
         logger.logger.setLevel(getattr(logging, self.args.log_level.upper()))
         
         return logger
     
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session that keeps Immich connections alive across uploads"""
+        session = requests.Session()
+        
+        # One pooled connection per worker, with headroom for the validation call
+        adapter = HTTPAdapter(
+            pool_connections=self.args.workers,
+            pool_maxsize=self.args.workers * 2,
+            max_retries=0
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"x-api-key": self._api_key})
+        
+        return session
+    
     def _validate_environment(self):
         """Validate environment and dependencies"""
         self.logger.info("🔍 Validating environment...")
@@ -241,12 +455,8 @@ class PhotoSyncOrchestrator:
         
         # Test Immich API connection
         try:
-            api_url = os.getenv("IMMICH_API_URL")
-            api_key = os.getenv("IMMICH_API_KEY")
-            
-            response = requests.get(
-                f"{api_url}/api-keys",
-                headers={"x-api-key": api_key},
+            response = self.session.get(
+                f"{self._api_url}/api-keys",
                 timeout=10
             )
             response.raise_for_status()
@@ -263,31 +473,104 @@ class PhotoSyncOrchestrator:
     
     def _call_swift_binary(self, args: List[str]) -> Dict:
         """Call Swift binary and parse JSON response"""
-        swift_binary = Path(self.config['paths']['swift_binary'])
-        cmd = [str(swift_binary)] + args
+        cmd = [str(self._swift_binary)] + args
         
         self.logger.debug(f"Calling Swift: {' '.join(cmd)}")
         
         try:
+            # Keep stdout as bytes; the JSON parser decodes it itself
             result = subprocess.run(
                 cmd,
                 capture_output=True,
-                text=True,
                 check=True,
-                timeout=120
+                timeout=_SWIFT_TIMEOUT
             )
             
-            self.logger.debug(f"Swift stdout: {result.stdout}")
-            return json.loads(result.stdout)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Swift stdout: {result.stdout.decode('utf-8', 'replace')}")
+            return _json_loads(result.stdout)
             
         except subprocess.CalledProcessError as e:
-            self.logger.debug(f"Swift stderr: {e.stderr}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Swift stderr: {e.stderr.decode('utf-8', 'replace')}")
             raise
         except subprocess.TimeoutExpired:
             raise TimeoutError("Swift binary timed out")
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON from Swift binary: {e}")
     
+    def _stream_swift_list(self, args: List[str]) -> Iterator[Dict]:
+        """Call a Swift list command and yield array items as they are parsed"""
+        if ijson is None:
+            items = self._call_swift_binary(args)
+            if not isinstance(items, list):
+                raise ValueError("Expected list of assets from Swift binary")
+            yield from items
+            return
+        
+        cmd = [str(self._swift_binary)] + args
+        
+        self.logger.debug(f"Calling Swift (streaming): {' '.join(cmd)}")
+        
+        # stderr goes to a file so a chatty binary can't fill the pipe and stall
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=1 << 20)
+            
+            timed_out = threading.Event()
+            
+            def _kill_on_timeout():
+                timed_out.set()
+                proc.kill()
+            
+            def _check_exit():
+                # A failed or killed process explains truncated output better
+                # than the JSON error it causes
+                returncode = proc.wait()
+                if timed_out.is_set():
+                    raise TimeoutError("Swift binary timed out")
+                if returncode != 0:
+                    stderr_file.seek(0)
+                    stderr = stderr_file.read()
+                    self.logger.debug(f"Swift stderr: {stderr.decode('utf-8', 'replace')}")
+                    raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+            
+            timer = threading.Timer(_SWIFT_TIMEOUT, _kill_on_timeout)
+            timer.start()
+            try:
+                events = ijson.parse(proc.stdout, use_float=True)
+                try:
+                    _, first_event, value = next(events)
+                    if first_event != 'start_array':
+                        # Failures are reported as a JSON object, e.g.
+                        # {"success": false, "error": "PhotoKit permission denied", "error_code": 2}
+                        error = None
+                        if first_event == 'start_map':
+                            builder = ijson.ObjectBuilder()
+                            builder.event(first_event, value)
+                            for _, event, value in events:
+                                builder.event(event, value)
+                            error = builder.value.get('error')
+                        try:
+                            _check_exit()
+                        except subprocess.CalledProcessError as e:
+                            if error:
+                                raise RuntimeError(
+                                    f"Swift binary failed with exit status {e.returncode}: {error}"
+                                ) from e
+                            raise
+                        raise ValueError(f"Expected list of assets from Swift binary, got: {error or first_event}")
+                    yield from ijson.items(events, 'item')
+                except ijson.JSONError as e:
+                    _check_exit()
+                    raise ValueError(f"Invalid JSON from Swift binary: {e}")
+                _check_exit()
+            finally:
+                timer.cancel()
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                proc.stdout.close()
+    
     def _discover_assets(self):
         """Discover assets using Swift binary"""
         self.logger.info("Discovering assets from iCloud Photo Library...")
@@ -303,43 +586,46 @@ class PhotoSyncOrchestrator:
         elif self.args.screenshots_only:
             swift_args.append('--screenshots-only')
         
-        # Call Swift binary
-        assets = self._call_swift_binary(swift_args)
+        # Stream assets from the Swift binary into the database in batches,
+        # counting by type as we go
+        type_counts = Counter()
+        total_assets = 0
+        batch = []
         
-        if not isinstance(assets, list):
-            raise ValueError("Expected list of assets from Swift binary")
+        for asset in self._stream_swift_list(swift_args):
+            batch.append(asset)
+            type_counts[asset['type']] += 1
+            if len(batch) >= _DISCOVERY_BATCH_SIZE:
+                self.db.add_assets(batch)
+                total_assets += len(batch)
+                batch = []
         
-        # Add to database
-        self.db.add_assets(assets)
+        if batch:
+            self.db.add_assets(batch)
+            total_assets += len(batch)
         
         # Set metadata
         self.db.set_metadata('started_at', datetime.now().isoformat())
-        self.db.set_metadata('total_assets', str(len(assets)))
+        self.db.set_metadata('total_assets', str(total_assets))
         self.db.set_metadata('asset_types', self.args.type)
         self.db.set_metadata('include_screenshots', str(not self.args.no_screenshots))
+        self.db.flush()
         
-        # Count by type
-        image_count = len([a for a in assets if a['type'] == 'image'])
-        video_count = len([a for a in assets if a['type'] == 'video'])
+        image_count = type_counts['image']
+        video_count = type_counts['video']
         
-        self.logger.info(f"Found {len(assets)} assets ({image_count} images, {video_count} videos)")
+        self.logger.info(f"Found {total_assets} assets ({image_count} images, {video_count} videos)")
         
-        return len(assets)
+        return total_assets
     
-    def _upload_to_immich(self, file_path: Path, metadata: Dict) -> Tuple[str, int, float]:
+    def _upload_to_immich(self, file_path: Path, metadata: Dict,
+                          file_size: Optional[int] = None) -> Tuple[str, int, float]:
         """Upload asset to Immich with metadata"""
-        api_url = os.getenv("IMMICH_API_URL")
-        api_key = os.getenv("IMMICH_API_KEY")
-        timeout = int(self.config['upload']['upload_timeout'])
-        
-        url = f"{api_url}/assets"
-        headers = {"x-api-key": api_key}
-        
-        file_size = file_path.stat().st_size
+        if file_size is None:
+            file_size = os.stat(file_path).st_size
         start_time = time.time()
         
         with open(file_path, 'rb') as f:
-            files = {'assetData': f}
             data = {
                 'deviceAssetId': metadata.get('asset_id', str(file_path)),
                 'deviceId': 'photo-sync-script',
@@ -355,38 +641,51 @@ class PhotoSyncOrchestrator:
             
             # Add GPS coordinates as direct fields (not in metadata array)
             if metadata.get('location'):
-                data['latitude'] = metadata['location']['latitude']
-                data['longitude'] = metadata['location']['longitude']
+                data['latitude'] = str(metadata['location']['latitude'])
+                data['longitude'] = str(metadata['location']['longitude'])
             
             # Note: Camera info goes in EXIF metadata, not custom metadata
             # Immich extracts this from the actual image file automatically
             
-            self.logger.debug(f"Uploading {file_path.name} ({file_size / 1024 / 1024:.1f} MB)")
-            self.logger.debug(f"Upload data: {data}")
+            self.logger.debug("Uploading %s (%.1f MB)", file_path.name, file_size * _INV_MB)
+            self.logger.debug("Upload data: %s", data)
             
-            response = requests.post(url, headers=headers, files=files, data=data, timeout=timeout)
+            # Stream the multipart body from disk instead of building it in memory;
+            # the file part goes last, as requests would have sent it
+            encoder = MultipartEncoder(fields={
+                **data,
+                'assetData': (file_path.name, f, 'application/octet-stream'),
+            })
+            
+            response = self.session.post(
+                self._upload_url,
+                data=encoder,
+                headers={'Content-Type': encoder.content_type},
+                timeout=self._upload_timeout
+            )
             
             # Log response details on error
             if response.status_code >= 400:
-                self.logger.debug(f"Error response status: {response.status_code}")
-                self.logger.debug(f"Error response headers: {response.headers}")
-                self.logger.debug(f"Error response body: {response.text}")
+                self.logger.debug("Error response status: %s", response.status_code)
+                self.logger.debug("Error response headers: %s", response.headers)
+                self.logger.debug("Error response body: %s", response.text)
             
             response.raise_for_status()
             
             upload_duration = time.time() - start_time
-            bandwidth = (file_size / upload_duration) / (1024 * 1024)  # MB/s
             
-            self.logger.debug(f"Upload complete: {bandwidth:.1f} MB/s")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                bandwidth = file_size * _INV_MB / upload_duration  # MB/s
+                self.logger.debug("Upload complete: %.1f MB/s", bandwidth)
             
             result = response.json()
             return result['id'], file_size, upload_duration
     
     def _process_asset_with_retries(self, asset: sqlite3.Row, progress_task) -> bool:
         """Process single asset with exponential backoff retry logic"""
-        max_retries = int(self.config['retry']['max_retries'])
-        retry_delays = [int(x.strip()) for x in self.config['retry']['retry_delays'].split(',')]
-        temp_dir = Path(self.config['paths']['temp_dir'])
+        max_retries = self._max_retries
+        retry_delays = self._retry_delays
+        temp_dir = self._temp_dir
         
         asset_id = asset['asset_id']
         
@@ -404,8 +703,11 @@ class PhotoSyncOrchestrator:
                 metadata = export_result['metadata']
                 metadata['asset_id'] = asset_id  # Add for Immich
                 
-                # Upload to Immich
-                immich_id, file_size, upload_duration = self._upload_to_immich(file_path, metadata)
+                # Upload to Immich; the exporter already reports the size of the
+                # file it wrote, so there is no need to stat it again
+                immich_id, file_size, upload_duration = self._upload_to_immich(
+                    file_path, metadata, metadata.get('file_size')
+                )
                 
                 # Cleanup temp file
                 try:
@@ -424,7 +726,7 @@ class PhotoSyncOrchestrator:
                 self.logger.debug(f"Attempt {attempt + 1} failed: {e}")
                 
                 if attempt < max_retries - 1:
-                    delay = retry_delays[min(attempt, len(retry_delays) - 1)] / 1000.0  # Convert to seconds
+                    delay = retry_delays[min(attempt, len(retry_delays) - 1)]
                     self.logger.warning(f"Failed to process {asset_id}: {e} (retry {attempt + 1}/{max_retries} in {delay * 1000:.0f}ms)")
                     time.sleep(delay)
                 else:
@@ -437,14 +739,13 @@ class PhotoSyncOrchestrator:
     
     def _process_assets(self):
         """Process all pending assets"""
-        max_retries = int(self.config['retry']['max_retries'])
-        pending_assets = self.db.get_pending_assets(max_retries)
+        pending_count = self.db.count_pending_assets(self._max_retries)
         
-        if not pending_assets:
+        if not pending_count:
             self.logger.success("No assets to process")
             return
         
-        self.logger.info(f"🔄 Processing {len(pending_assets)} assets...")
+        self.logger.info(f"🔄 Processing {pending_count} assets...")
         
         console = Console()
         
@@ -463,39 +764,84 @@ class PhotoSyncOrchestrator:
             console=console
         ) as progress:
             
-            task = progress.add_task("Processing assets", total=len(pending_assets), speed=0.0)
+            task = progress.add_task("Processing assets", total=pending_count, speed=0.0)
             start_time = time.time()
+            last_desc_ts = 0.0
             
-            for i, asset in enumerate(pending_assets):
-                if self.shutdown_requested:
-                    self.logger.warning("Graceful shutdown requested. Stopping processing.")
-                    break
-                
-                # Update progress description
-                progress.update(task, description=f"Processing {asset['original_filename'] or asset['asset_id']}")
-                
-                # Process asset
-                success = self._process_asset_with_retries(asset, task)
-                
-                # Calculate speed
-                elapsed = time.time() - start_time
-                processed_count = i + 1
-                speed = (processed_count / elapsed) * 60 if elapsed > 0 else 0.0  # assets per minute
-                
-                # Update progress with speed
-                progress.update(task, advance=1, speed=speed)
-                
-                # Log speed every 10 assets at INFO level
-                if processed_count % 10 == 0:
-                    self.logger.info(f"Speed: {speed:.1f} assets/min | Progress: {processed_count}/{len(pending_assets)} ({processed_count/len(pending_assets)*100:.1f}%)")
-                
-                # Update progress in DB periodically
-                update_interval = int(self.config['processing']['progress_update_interval'])
-                if (i + 1) % update_interval == 0:
-                    stats = self.db.get_stats()
-                    progress_percent = (stats['completed'] / stats['total']) * 100 if stats['total'] > 0 else 0
-                    self.db.set_metadata('progress_percent', f"{progress_percent:.2f}")
-                    self.db.set_metadata('last_progress_update', datetime.now().isoformat())
+            def start_asset(asset):
+                # Runs on the worker, so the description names an asset that is
+                # actually being processed rather than one just queued. Updated
+                # at most a few times a second; a race here only costs an extra update
+                nonlocal last_desc_ts
+                now = time.monotonic()
+                if now - last_desc_ts >= _PROGRESS_DESC_INTERVAL:
+                    last_desc_ts = now
+                    progress.update(task, description=f"Processing {asset['original_filename'] or asset['asset_id']}")
+                return self._process_asset_with_retries(asset, task)
+            
+            workers = self.args.workers
+            asset_iter = self.db.get_pending_assets(self._max_retries)
+            in_flight = set()
+            processed_count = 0
+            stopping = False
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync-worker",
+                                    initializer=init_thread_log_id) as executor:
+                while True:
+                    # On shutdown, stop feeding and cancel assets still waiting in the
+                    # executor; only the ones already running are finished
+                    if self.shutdown_requested and not stopping:
+                        self.logger.info("\n🛑 Shutdown signal received. Finishing current asset...")
+                        self.logger.warning("Graceful shutdown requested. Stopping processing.")
+                        stopping = True
+                        for future in in_flight:
+                            future.cancel()
+                    
+                    # Keep up to two assets per worker queued
+                    while not stopping and len(in_flight) < workers * 2:
+                        asset = next(asset_iter, None)
+                        if asset is None:
+                            break
+                        in_flight.add(executor.submit(start_asset, asset))
+                    
+                    if not in_flight:
+                        break
+                    
+                    # Wake up periodically so a shutdown request is acted on before
+                    # the next queued asset gets picked up by a worker
+                    done, in_flight = wait(in_flight, timeout=_SHUTDOWN_POLL_INTERVAL,
+                                           return_when=FIRST_COMPLETED)
+                    
+                    for future in done:
+                        if future.cancelled():
+                            continue
+                        future.result()
+                        processed_count += 1
+                        refresh_speed = processed_count % _SPEED_UPDATE_EVERY == 0
+                        
+                        # Recalculate speed every few assets and on the last one
+                        if refresh_speed or processed_count == pending_count:
+                            elapsed = time.time() - start_time
+                            speed = (processed_count / elapsed) * 60 if elapsed > 0 else 0.0  # assets per minute
+                            progress.update(task, advance=1, speed=speed)
+                        else:
+                            progress.update(task, advance=1)
+                        
+                        # Log speed every few assets at INFO level
+                        if refresh_speed:
+                            self.logger.info(f"Speed: {speed:.1f} assets/min | Progress: {processed_count}/{pending_count} ({processed_count/pending_count*100:.1f}%)")
+                        
+                        # Update progress in DB periodically; asset status writes
+                        # are committed in the same batch
+                        if processed_count % self._progress_update_interval == 0:
+                            stats = self.db.get_stats()
+                            progress_percent = (stats['completed'] / stats['total']) * 100 if stats['total'] > 0 else 0
+                            self.db.set_metadata('progress_percent', f"{progress_percent:.2f}")
+                            self.db.set_metadata('last_progress_update', datetime.now().isoformat())
+                            self.db.flush()
+            
+            # Commit the final partial batch (also reached on graceful shutdown)
+            self.db.flush()
     
     def _print_summary(self):
         """Print final processing summary"""
@@ -515,6 +861,7 @@ class PhotoSyncOrchestrator:
         
         # Set final metadata
         self.db.set_metadata('last_updated', datetime.now().isoformat())
+        self.db.flush()
         
         return 0 if stats['failed'] == 0 else 1
     
@@ -573,6 +920,7 @@ class PhotoSyncOrchestrator:
         finally:
             if self.db:
                 self.db.close()
+            self.session.close()
 
 
 def main():
@@ -597,7 +945,7 @@ Examples:
     parser.add_argument('--no-screenshots', action='store_true', default=True,
                        help='Exclude screenshots (default)')
     parser.add_argument('--workers', type=int, default=1,
-                       help='Number of parallel workers (future feature)')
+                       help='Number of assets to export and upload in parallel')
     parser.add_argument('--resume', action='store_true',
                        help='Resume from existing state.db')
     parser.add_argument('--reset', action='store_true',
@@ -614,6 +962,9 @@ Examples:
     if args.resume and args.reset:
         parser.error("Cannot use both --resume and --reset")
     
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
     # Run orchestrator
     orchestrator = PhotoSyncOrchestrator(args)
     sys.exit(orchestrator.run())
@@ -1,44 +1,104 @@
 import subprocess
-import json
+import copy
+import re
 import tempfile
 import shutil
 from pathlib import Path
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import fastjsonschema
+import orjson
+
+# Resolved once at import; tests run from the repository root
+SWIFT_BINARY = Path('.lib/photo-exporter').resolve(strict=False)
+_BINARY_STR = str(SWIFT_BINARY)
+
+# Parsed list-assets output keyed by argv; the library doesn't change during a run
+_list_cache = {}
 
 def run_swift_command(args: list, expect_success=True, timeout=60):
     """
     Execute photo-exporter with given arguments
     Returns: JSON result if success expected, (exit_code, stderr) if not
+    
+    Successful list-assets results are cached per argv and handed out as deep
+    copies; call run_swift_command.cache_clear() to force a fresh run.
     """
-    binary = Path('.lib/photo-exporter')
-    if not binary.exists():
-        raise FileNotFoundError(f"Swift binary not found: {binary}")
+    cache_key = tuple(args) if expect_success and args and args[0] == 'list-assets' else None
+    if cache_key in _list_cache:
+        return copy.deepcopy(_list_cache[cache_key])
     
     try:
+        # Keep stdout as bytes: orjson parses them directly, with no decode pass.
+        # Exit codes are dispatched below rather than via check=True
         result = subprocess.run(
-            [str(binary)] + args,
-            capture_output=True,
-            text=True,
+            [_BINARY_STR, *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             timeout=timeout,
-            check=expect_success
+            check=False
         )
-        
-        if expect_success:
-            if result.stdout.strip():
-                return json.loads(result.stdout)
-            else:
-                raise ValueError("Empty output from command")
-        else:
-            return result.returncode, result.stderr
-            
-    except subprocess.CalledProcessError as e:
-        if expect_success:
-            raise AssertionError(f"Command failed with exit code {e.returncode}. Stdout: {e.stdout}. Stderr: {e.stderr}")
-        return e.returncode, e.stderr
-    except json.JSONDecodeError as e:
-        raise AssertionError(f"Invalid JSON output: {result.stdout}")
     except subprocess.TimeoutExpired:
         raise AssertionError(f"Command timed out after {timeout} seconds")
+    
+    if not expect_success:
+        return result.returncode, result.stderr.decode('utf-8', 'replace')
+    
+    if result.returncode != 0:
+        raise AssertionError(
+            f"Command failed with exit code {result.returncode}. "
+            f"Stdout: {result.stdout.decode('utf-8', 'replace')}. Stderr: {result.stderr.decode('utf-8', 'replace')}"
+        )
+    
+    if not result.stdout.strip():
+        raise ValueError("Empty output from command")
+    
+    try:
+        parsed = orjson.loads(result.stdout)
+    except orjson.JSONDecodeError:
+        raise AssertionError(f"Invalid JSON output: {result.stdout.decode('utf-8', 'replace')}")
+    
+    if cache_key is not None:
+        _list_cache[cache_key] = parsed
+        return copy.deepcopy(parsed)
+    return parsed
+
+run_swift_command.cache_clear = _list_cache.clear
+
+def run_swift_commands_parallel(list_of_argvs, max_workers=4, return_exceptions=False):
+    """
+    Run independent photo-exporter commands concurrently
+    Returns: results in the same order as list_of_argvs. With return_exceptions,
+    a failed command's exception takes its place instead of being raised.
+    """
+    def run(args):
+        try:
+            return run_swift_command(args)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+    
+    # Threads are enough: each one just waits on its subprocess
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, list_of_argvs))
+
+def run_swift_batch_export(pairs, max_workers=4, return_exceptions=False):
+    """
+    Export several assets: pairs is an iterable of (asset_id, output_dir)
+    Returns: export results in input order (see run_swift_commands_parallel)
+    
+    photo-exporter has no batch verb, so each export is still its own process;
+    they are overlapped instead. Swap the body for a single invocation if the
+    binary ever grows one.
+    """
+    return run_swift_commands_parallel(
+        [['export-asset', asset_id, output_dir] for asset_id, output_dir in pairs],
+        max_workers=max_workers,
+        return_exceptions=return_exceptions
+    )
 
 def create_temp_export_dir():
     """Create temporary directory for export tests"""
@@ -49,90 +109,161 @@ def cleanup_temp_dir(temp_dir):
     if Path(temp_dir).exists():
         shutil.rmtree(temp_dir)
 
+# ISO 8601 UTC timestamps as photo-exporter writes them, e.g. 2024-01-01T12:00:00.000Z
+ISO8601_UTC_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z$'
+ISO8601_UTC = re.compile(ISO8601_UTC_PATTERN)
+
+# JSON schemas mirroring the photo-exporter output contract, compiled once at import
+ASSET_SCHEMA = {
+    'type': 'object',
+    'required': ['id', 'type', 'creation_date', 'is_screenshot', 'is_live_photo'],
+    'properties': {
+        'id': {'type': 'string', 'pattern': '/'},  # e.g. "ABC123/L0/001"
+        'type': {'enum': ['image', 'video']},
+        'creation_date': {'type': 'string', 'pattern': ISO8601_UTC_PATTERN},
+        'is_screenshot': {'type': 'boolean'},
+        'is_live_photo': {'type': 'boolean'},
+    },
+}
+
+EXPORT_SCHEMA = {
+    'type': 'object',
+    'required': ['success', 'file_path', 'metadata'],
+    'properties': {
+        'success': {'const': True},
+        'file_path': {'type': 'string'},
+        'metadata': {
+            'type': 'object',
+            # live_photo_video_complement is optional and may be omitted when null
+            'required': [
+                'original_filename', 'creation_date', 'file_size',
+                'is_live_photo', 'media_type', 'dimensions', 'format'
+            ],
+            'properties': {
+                'file_size': {'type': 'integer', 'exclusiveMinimum': 0},
+                'is_live_photo': {'type': 'boolean'},
+                'media_type': {'enum': ['image', 'video']},
+                'dimensions': {
+                    'type': 'object',
+                    'required': ['width', 'height'],
+                    'properties': {
+                        'width': {'type': 'integer', 'exclusiveMinimum': 0},
+                        'height': {'type': 'integer', 'exclusiveMinimum': 0},
+                    },
+                },
+            },
+        },
+    },
+}
+
+ERROR_SCHEMA = {
+    'type': 'object',
+    'required': ['success', 'error', 'error_code'],
+    'properties': {
+        'success': {'const': False},
+        'error': {'type': 'string', 'minLength': 1},
+        'error_code': {'type': 'integer'},
+    },
+}
+
+_REQUIRED_ASSET_FIELDS = frozenset(ASSET_SCHEMA['required'])
+_REQUIRED_EXPORT_FIELDS = frozenset(EXPORT_SCHEMA['required'])
+_REQUIRED_METADATA_FIELDS = frozenset(EXPORT_SCHEMA['properties']['metadata']['required'])
+_REQUIRED_ERROR_FIELDS = frozenset(ERROR_SCHEMA['required'])
+
+_ASSET_VALIDATOR = fastjsonschema.compile(ASSET_SCHEMA)
+_EXPORT_VALIDATOR = fastjsonschema.compile(EXPORT_SCHEMA)
+_ERROR_VALIDATOR = fastjsonschema.compile(ERROR_SCHEMA)
+
+def _check_schema(validator, data, kind):
+    """Run a compiled validator, reporting violations as pytest assertion failures"""
+    try:
+        validator(data)
+    except fastjsonschema.JsonSchemaException as e:
+        raise AssertionError(f"Invalid {kind}: {e.message}") from None
+
 def validate_asset_schema(asset_data):
     """Validate list-assets JSON schema"""
-    required_fields = ['id', 'type', 'creation_date', 'is_screenshot', 'is_live_photo']
-    for field in required_fields:
-        assert field in asset_data, f"Missing required field: {field}"
-    
-    assert asset_data['type'] in ['image', 'video'], f"Invalid type: {asset_data['type']}"
-    assert isinstance(asset_data['is_screenshot'], bool), f"is_screenshot must be boolean, got {type(asset_data['is_screenshot'])}"
-    assert isinstance(asset_data['is_live_photo'], bool), f"is_live_photo must be boolean, got {type(asset_data['is_live_photo'])}"
-    
-    # Validate ID format (should be like "ABC123/L0/001")
-    assert '/' in asset_data['id'], f"Invalid ID format: {asset_data['id']}"
+    missing = _REQUIRED_ASSET_FIELDS - asset_data.keys()
+    assert not missing, f"Missing fields: {sorted(missing)}"
     
-    # Validate date format (should be ISO 8601)
-    assert 'T' in asset_data['creation_date'], f"Invalid date format: {asset_data['creation_date']}"
-    assert asset_data['creation_date'].endswith('Z'), f"Date should end with Z: {asset_data['creation_date']}"
+    _check_schema(_ASSET_VALIDATOR, asset_data, 'asset')
 
 def validate_export_schema(export_data):
     """Validate export-asset JSON schema"""
-    assert 'success' in export_data, "Missing 'success' field"
-    assert export_data['success'] is True, f"Expected success=True, got {export_data['success']}"
-    assert 'file_path' in export_data, "Missing 'file_path' field"
-    assert 'metadata' in export_data, "Missing 'metadata' field"
-    
-    # Validate file path exists
-    file_path = Path(export_data['file_path'])
-    assert file_path.exists(), f"Exported file does not exist: {file_path}"
-    assert file_path.is_file(), f"Export path is not a file: {file_path}"
+    # Cheap required-key checks first, so an obviously malformed result fails
+    # before any nested validation or filesystem access
+    missing = _REQUIRED_EXPORT_FIELDS - export_data.keys()
+    assert not missing, f"Missing fields: {sorted(missing)}"
     
     metadata = export_data['metadata']
-    required_metadata = [
-        'original_filename', 'creation_date', 'file_size',
-        'is_live_photo', 'media_type', 'dimensions', 'format'
-    ]
-    for field in required_metadata:
-        assert field in metadata, f"Missing metadata field: {field}"
+    if isinstance(metadata, dict):
+        missing = _REQUIRED_METADATA_FIELDS - metadata.keys()
+        assert not missing, f"Missing metadata fields: {sorted(missing)}"
     
-    # live_photo_video_complement is optional and may be omitted when null
-    # but if present, should be null for our current implementation
+    _check_schema(_EXPORT_VALIDATOR, export_data, 'export result')
     
-    # Validate metadata types
-    assert isinstance(metadata['file_size'], int), f"file_size must be int, got {type(metadata['file_size'])}"
-    assert metadata['file_size'] > 0, f"file_size must be positive, got {metadata['file_size']}"
-    assert isinstance(metadata['is_live_photo'], bool), f"is_live_photo must be bool"
-    assert metadata['media_type'] in ['image', 'video'], f"Invalid media_type: {metadata['media_type']}"
-    
-    # Validate dimensions
+    # JSON Schema's 'integer' also accepts integral floats such as 1.0
     dimensions = metadata['dimensions']
-    assert 'width' in dimensions and 'height' in dimensions, "Missing width/height in dimensions"
+    assert isinstance(metadata['file_size'], int), f"file_size must be int, got {type(metadata['file_size'])}"
     assert isinstance(dimensions['width'], int) and isinstance(dimensions['height'], int), "Dimensions must be integers"
-    assert dimensions['width'] > 0 and dimensions['height'] > 0, "Dimensions must be positive"
+    
+    # Validate file path exists
+    file_path = Path(export_data['file_path'])
+    assert file_path.exists(), f"Exported file does not exist: {file_path}"
+    assert file_path.is_file(), f"Export path is not a file: {file_path}"
 
 def validate_error_schema(error_data, expected_code=None):
     """Validate error response JSON schema"""
-    assert 'success' in error_data, "Missing 'success' field in error"
-    assert error_data['success'] is False, f"Expected success=False in error, got {error_data['success']}"
-    assert 'error' in error_data, "Missing 'error' field"
-    assert 'error_code' in error_data, "Missing 'error_code' field"
+    missing = _REQUIRED_ERROR_FIELDS - error_data.keys()
+    assert not missing, f"Missing fields in error: {sorted(missing)}"
+    
+    _check_schema(_ERROR_VALIDATOR, error_data, 'error response')
     
-    assert isinstance(error_data['error'], str), f"Error message must be string, got {type(error_data['error'])}"
+    # JSON Schema's 'integer' also accepts integral floats such as 1.0
     assert isinstance(error_data['error_code'], int), f"Error code must be int, got {type(error_data['error_code'])}"
-    assert len(error_data['error']) > 0, "Error message cannot be empty"
     
     if expected_code is not None:
         assert error_data['error_code'] == expected_code, f"Expected error code {expected_code}, got {error_data['error_code']}"
 
 def measure_performance(func, *args, **kwargs):
-    """Measure execution time of a function"""
-    start_time = time.time()
+    """Measure execution time of a function (monotonic, in seconds)"""
+    start_ns = time.perf_counter_ns()
     result = func(*args, **kwargs)
-    duration = time.time() - start_time
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
     return result, duration
 
+Classified = namedtuple('Classified', 'images videos live_photos screenshots')
+
+def classify_assets(assets):
+    """Split an asset list into images, videos, Live Photos and screenshots in one pass"""
+    images, videos, live_photos, screenshots = [], [], [], []
+    for asset in assets:
+        if asset['type'] == 'image':
+            images.append(asset)
+        elif asset['type'] == 'video':
+            videos.append(asset)
+        if asset['is_live_photo']:
+            live_photos.append(asset)
+        if asset['is_screenshot']:
+            screenshots.append(asset)
+    return Classified(images, videos, live_photos, screenshots)
+
+# Asset type -> Classified field holding assets of that type
+_CLASSIFIED_BY_TYPE = {'image': 'images', 'video': 'videos'}
+
 def count_assets_by_type(assets, asset_type):
     """Count assets of specific type"""
-    return len([asset for asset in assets if asset['type'] == asset_type])
+    field = _CLASSIFIED_BY_TYPE.get(asset_type)
+    return len(getattr(classify_assets(assets), field)) if field else 0
 
 def find_live_photos(assets):
     """Find Live Photo assets in asset list"""
-    return [asset for asset in assets if asset['is_live_photo']]
+    return classify_assets(assets).live_photos
 
 def find_screenshots(assets):
     """Find screenshot assets in asset list"""
-    return [asset for asset in assets if asset['is_screenshot']]
+    return classify_assets(assets).screenshots
 
 def get_asset_by_type(assets, asset_type, count=1):
     """Get assets of specific type"""
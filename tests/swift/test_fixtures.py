@@ -2,32 +2,44 @@ import pytest
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from swift_test_helpers import run_swift_command, create_temp_export_dir, cleanup_temp_dir
+from swift_test_helpers import SWIFT_BINARY, run_swift_command, create_temp_export_dir, cleanup_temp_dir
 
-@pytest.fixture
-def sample_assets():
-    """Get sample assets for testing"""
+@pytest.fixture(scope="session", autouse=True)
+def swift_binary():
+    """Fail fast, once per session, if the Swift binary hasn't been built"""
+    if not SWIFT_BINARY.exists():
+        raise FileNotFoundError(f"Swift binary not found: {SWIFT_BINARY}")
+    return SWIFT_BINARY
+
+@pytest.fixture(scope="session")
+def _all_assets():
+    """List the whole library once; the typed views below filter it in Python"""
     return run_swift_command(['list-assets', '--type', 'all'])
 
-@pytest.fixture  
-def image_assets():
+@pytest.fixture(scope="session")
+def sample_assets(_all_assets):
+    """Get sample assets for testing"""
+    return _all_assets
+
+@pytest.fixture(scope="session")
+def image_assets(_all_assets):
     """Get only image assets"""
-    return run_swift_command(['list-assets', '--type', 'image'])
+    return [asset for asset in _all_assets if asset['type'] == 'image']
 
-@pytest.fixture
-def video_assets():
+@pytest.fixture(scope="session")
+def video_assets(_all_assets):
     """Get only video assets"""
-    return run_swift_command(['list-assets', '--type', 'video'])
+    return [asset for asset in _all_assets if asset['type'] == 'video']
 
-@pytest.fixture
-def image_assets_no_screenshots():
+@pytest.fixture(scope="session")
+def image_assets_no_screenshots(image_assets):
     """Get image assets excluding screenshots"""
-    return run_swift_command(['list-assets', '--type', 'image', '--no-screenshots'])
+    return [asset for asset in image_assets if not asset['is_screenshot']]
 
-@pytest.fixture
-def screenshot_assets():
+@pytest.fixture(scope="session")
+def screenshot_assets(image_assets):
     """Get only screenshot assets"""
-    return run_swift_command(['list-assets', '--screenshots-only'])
+    return [asset for asset in image_assets if asset['is_screenshot']]
 
 @pytest.fixture
 def temp_export_dir():
@@ -36,18 +48,33 @@ def temp_export_dir():
     yield temp_dir
     cleanup_temp_dir(temp_dir)
 
-@pytest.fixture
-def small_asset_list():
+@pytest.fixture(scope="session")
+def session_export_dir():
+    """Provide an export directory shared by read-only export tests"""
+    temp_dir = create_temp_export_dir()
+    yield temp_dir
+    cleanup_temp_dir(temp_dir)
+
+@pytest.fixture(scope="session")
+def session_exported_asset(image_assets, session_export_dir):
+    """Export the first image asset once; returns (asset, export result)"""
+    if not image_assets:
+        pytest.skip("No image assets available for testing")
+    
+    asset = image_assets[0]
+    return asset, run_swift_command(['export-asset', asset['id'], session_export_dir])
+
+@pytest.fixture(scope="session")
+def small_asset_list(image_assets):
     """Get a small list of assets for performance tests"""
-    all_assets = run_swift_command(['list-assets', '--type', 'image'])
-    return all_assets[:5]  # Return first 5 assets only
+    return image_assets[:5]  # Return first 5 assets only
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_photo_assets(image_assets):
     """Get Live Photo assets if any exist"""
     return [asset for asset in image_assets if asset['is_live_photo']]
 
-@pytest.fixture 
+@pytest.fixture(scope="session")
 def regular_photo_assets(image_assets):
     """Get regular photo assets (non-Live Photos)"""
     return [asset for asset in image_assets if not asset['is_live_photo']]
\ No newline at end of file
@@ -1,17 +1,43 @@
 import pytest
 import os
 from pathlib import Path
+from time import perf_counter
 from swift_test_helpers import (
-    run_swift_command, validate_asset_schema, validate_export_schema, 
-    validate_error_schema, measure_performance, count_assets_by_type,
-    find_live_photos, find_screenshots, get_asset_by_type
+    SWIFT_BINARY, ISO8601_UTC, run_swift_command, run_swift_batch_export, validate_asset_schema, validate_export_schema, 
+    validate_error_schema, measure_performance, get_asset_by_type, classify_assets
 )
 from test_fixtures import (
-    sample_assets, image_assets, video_assets, temp_export_dir,
+    swift_binary, _all_assets, sample_assets, image_assets, video_assets, temp_export_dir,
     image_assets_no_screenshots, screenshot_assets, small_asset_list,
+    session_export_dir, session_exported_asset,
     live_photo_assets, regular_photo_assets
 )
 
+# Per-asset fixture name -> the list-assets --type filter its cases come from
+_TYPED_ASSET_PARAMS = {'image_asset': 'image', 'video_asset': 'video'}
+
+def pytest_generate_tests(metafunc):
+    """Give per-asset tests one case per asset the binary lists for that type"""
+    for name, asset_type in _TYPED_ASSET_PARAMS.items():
+        if name not in metafunc.fixturenames:
+            continue
+        
+        # Same argv as test_asset_count_consistency, so the run_swift_command cache
+        # serves both. Listing failures become one skipped placeholder case instead
+        # of a collection error for the whole module
+        if not SWIFT_BINARY.exists():
+            metafunc.parametrize(name, [pytest.param(None, marks=pytest.mark.skip(
+                reason=f"Swift binary not found: {SWIFT_BINARY}"))])
+            continue
+        try:
+            assets = run_swift_command(['list-assets', '--type', asset_type])
+        except Exception as e:
+            metafunc.parametrize(name, [pytest.param(None, marks=pytest.mark.skip(
+                reason=f"list-assets --type {asset_type} failed: {e}"))])
+            continue
+        
+        metafunc.parametrize(name, assets, ids=[asset['id'] for asset in assets])
+
 class TestListAssets:
     """Test list-assets command functionality"""
     
@@ -23,37 +49,43 @@ class TestListAssets:
             validate_asset_schema(sample_assets[0])
             print(f"Found {len(sample_assets)} total assets")
     
-    def test_list_assets_type_image(self, image_assets):
+    def test_list_assets_type_image(self, image_asset):
         """Test --type image filter"""
-        for asset in image_assets:
-            assert asset['type'] == 'image', f"Expected image type, got {asset['type']}"
-            validate_asset_schema(asset)
-        
-        if image_assets:
-            print(f"Found {len(image_assets)} image assets")
+        assert image_asset['type'] == 'image', f"Expected image type, got {image_asset['type']}"
+        validate_asset_schema(image_asset)
     
-    def test_list_assets_type_video(self, video_assets):
+    def test_list_assets_type_video(self, video_asset):
         """Test --type video filter"""
-        for asset in video_assets:
-            assert asset['type'] == 'video', f"Expected video type, got {asset['type']}"
-            validate_asset_schema(asset)
-        
-        if video_assets:
-            print(f"Found {len(video_assets)} video assets")
+        assert video_asset['type'] == 'video', f"Expected video type, got {video_asset['type']}"
+        validate_asset_schema(video_asset)
     
     def test_no_screenshots_filter(self, image_assets_no_screenshots):
         """Test --no-screenshots excludes screenshots"""
-        for asset in image_assets_no_screenshots:
+        # The fixture is filtered in Python; ask the binary to apply the flag itself
+        cli_assets = run_swift_command(['list-assets', '--type', 'image', '--no-screenshots'])
+        for asset in cli_assets:
             assert asset['is_screenshot'] is False, f"Found screenshot when excluded: {asset['id']}"
         
-        print(f"Found {len(image_assets_no_screenshots)} non-screenshot images")
+        cli_ids = {asset['id'] for asset in cli_assets}
+        expected_ids = {asset['id'] for asset in image_assets_no_screenshots}
+        assert cli_ids == expected_ids, \
+            f"--no-screenshots mismatch: {len(cli_ids - expected_ids)} unexpected, {len(expected_ids - cli_ids)} missing"
+        
+        print(f"Found {len(cli_assets)} non-screenshot images")
     
     def test_screenshots_only_filter(self, screenshot_assets):
         """Test --screenshots-only includes only screenshots"""
-        for asset in screenshot_assets:
+        # The fixture is filtered in Python; ask the binary to apply the flag itself
+        cli_assets = run_swift_command(['list-assets', '--screenshots-only'])
+        for asset in cli_assets:
             assert asset['is_screenshot'] is True, f"Found non-screenshot when filtering for screenshots: {asset['id']}"
         
-        print(f"Found {len(screenshot_assets)} screenshot assets")
+        cli_ids = {asset['id'] for asset in cli_assets}
+        expected_ids = {asset['id'] for asset in screenshot_assets}
+        assert cli_ids == expected_ids, \
+            f"--screenshots-only mismatch: {len(cli_ids - expected_ids)} unexpected, {len(expected_ids - cli_ids)} missing"
+        
+        print(f"Found {len(cli_assets)} screenshot assets")
     
     def test_invalid_type_argument(self):
         """Test invalid --type argument handling"""
@@ -63,11 +95,17 @@ class TestListAssets:
         )
         assert exit_code == 64, f"Expected exit code 64 for invalid argument, got {exit_code}"
     
-    def test_asset_count_consistency(self, sample_assets, image_assets, video_assets):
+    def test_asset_count_consistency(self, sample_assets):
         """Test that type-specific counts match total"""
         if sample_assets:
-            total_images = count_assets_by_type(sample_assets, 'image')
-            total_videos = count_assets_by_type(sample_assets, 'video')
+            classified = classify_assets(sample_assets)
+            total_images = len(classified.images)
+            total_videos = len(classified.videos)
+            
+            # The typed fixtures are filtered in Python, so ask the binary directly
+            # to make sure its --type filter agrees
+            image_assets = run_swift_command(['list-assets', '--type', 'image'])
+            video_assets = run_swift_command(['list-assets', '--type', 'video'])
             
             assert len(image_assets) == total_images, f"Image count mismatch: {len(image_assets)} vs {total_images}"
             assert len(video_assets) == total_videos, f"Video count mismatch: {len(video_assets)} vs {total_videos}"
@@ -76,20 +114,15 @@ class TestListAssets:
 class TestExportAsset:
     """Test export-asset command functionality"""
     
-    def test_export_image_asset(self, image_assets, temp_export_dir):
+    def test_export_image_asset(self, session_exported_asset):
         """Test exporting a valid image asset"""
-        if not image_assets:
-            pytest.skip("No image assets available for testing")
-        
-        asset_id = image_assets[0]['id']
-        result = run_swift_command(['export-asset', asset_id, temp_export_dir])
+        _, result = session_exported_asset
         
         validate_export_schema(result)
         
-        # Verify file actually exists and has content
+        # Verify file actually exists; a positive file_size was already checked by validate_export_schema
         exported_file = Path(result['file_path'])
         assert exported_file.exists(), f"Exported file missing: {exported_file}"
-        assert exported_file.stat().st_size > 0, f"Exported file is empty: {exported_file}"
         
         # Verify metadata consistency
         metadata = result['metadata']
@@ -107,10 +140,9 @@ class TestExportAsset:
         
         validate_export_schema(result)
         
-        # Verify file exists and has content
+        # Verify file exists; a positive file_size was already checked by validate_export_schema
         exported_file = Path(result['file_path'])
         assert exported_file.exists(), f"Exported video file missing: {exported_file}"
-        assert exported_file.stat().st_size > 0, f"Exported video file is empty: {exported_file}"
         
         # Verify video-specific metadata
         metadata = result['metadata']
@@ -130,13 +162,9 @@ class TestExportAsset:
         )
         assert exit_code == 4, f"Expected exit code 4 for export failure, got {exit_code}"
     
-    def test_filename_generation(self, image_assets, temp_export_dir):
+    def test_filename_generation(self, session_exported_asset):
         """Test that exported filenames are properly generated"""
-        if not image_assets:
-            pytest.skip("No image assets available for testing")
-        
-        asset = image_assets[0]
-        result = run_swift_command(['export-asset', asset['id'], temp_export_dir])
+        asset, result = session_exported_asset
         
         exported_file = Path(result['file_path'])
         
@@ -179,18 +207,20 @@ class TestErrorHandling:
         # Help commands don't return JSON, they return text
         # We should test them separately without expecting JSON
         import subprocess
-        
-        # Main help
-        result = subprocess.run(['.lib/photo-exporter', '--help'], capture_output=True, text=True)
-        assert result.returncode == 0, f"Help command failed with exit code {result.returncode}"
-        assert 'OVERVIEW' in result.stdout, "Help should contain overview"
-        
-        # Subcommand help
-        result = subprocess.run(['.lib/photo-exporter', 'list-assets', '--help'], capture_output=True, text=True)
-        assert result.returncode == 0, f"list-assets help failed with exit code {result.returncode}"
-        
-        result = subprocess.run(['.lib/photo-exporter', 'export-asset', '--help'], capture_output=True, text=True)
-        assert result.returncode == 0, f"export-asset help failed with exit code {result.returncode}"
+        from concurrent.futures import ThreadPoolExecutor
+        
+        # Main help and subcommand help are independent, so launch them together
+        help_args = [['--help'], ['list-assets', '--help'], ['export-asset', '--help']]
+        with ThreadPoolExecutor(max_workers=len(help_args)) as executor:
+            main_help, list_help, export_help = executor.map(
+                lambda args: subprocess.run([str(SWIFT_BINARY), *args], capture_output=True),
+                help_args
+            )
+        
+        assert main_help.returncode == 0, f"Help command failed with exit code {main_help.returncode}"
+        assert b'OVERVIEW' in main_help.stdout, "Help should contain overview"
+        assert list_help.returncode == 0, f"list-assets help failed with exit code {list_help.returncode}"
+        assert export_help.returncode == 0, f"export-asset help failed with exit code {export_help.returncode}"
 
 class TestLivePhotos:
     """Test Live Photos detection and handling"""
@@ -250,6 +280,7 @@ class TestPerformance:
     
     def test_list_assets_performance(self):
         """Test list-assets performance with timing"""
+        run_swift_command.cache_clear()  # time a real run, not a cache hit
         result, duration = measure_performance(run_swift_command, ['list-assets'])
         
         # Should complete within reasonable time (adjust based on library size)
@@ -278,17 +309,22 @@ class TestPerformance:
         if len(small_asset_list) < 2:
             pytest.skip("Need at least 2 assets for batch performance test")
         
-        start_time = __import__('time').time()
+        start_time = perf_counter()
         successful_exports = 0
         
-        for asset in small_asset_list:
-            try:
-                result = run_swift_command(['export-asset', asset['id'], temp_export_dir])
+        # Exports are independent, so submit them as one batch
+        results = run_swift_batch_export(
+            [(asset['id'], temp_export_dir) for asset in small_asset_list],
+            return_exceptions=True
+        )
+        
+        for asset, result in zip(small_asset_list, results):
+            if isinstance(result, Exception):
+                print(f"Failed to export {asset['id']}: {result}")
+            else:
                 successful_exports += 1
-            except Exception as e:
-                print(f"Failed to export {asset['id']}: {e}")
         
-        total_duration = __import__('time').time() - start_time
+        total_duration = perf_counter() - start_time
         avg_duration = total_duration / successful_exports if successful_exports > 0 else 0
         
         print(f"Exported {successful_exports}/{len(small_asset_list)} assets in {total_duration:.2f}s (avg: {avg_duration:.2f}s per asset)")
@@ -301,10 +337,16 @@ class TestDataIntegrity:
         if not sample_assets:
             pytest.skip("No assets available for uniqueness test")
         
-        asset_ids = [asset['id'] for asset in sample_assets]
-        unique_ids = set(asset_ids)
+        seen = set()
+        add = seen.add
+        duplicates = []
+        for asset_id in (asset['id'] for asset in sample_assets):
+            if asset_id in seen:
+                duplicates.append(asset_id)
+            else:
+                add(asset_id)
         
-        assert len(asset_ids) == len(unique_ids), f"Found duplicate asset IDs: {len(asset_ids)} total, {len(unique_ids)} unique"
+        assert not duplicates, f"Found {len(duplicates)} duplicate asset IDs: {duplicates[:10]}"
     
     def test_creation_dates_format(self, sample_assets):
         """Test that creation dates are properly formatted"""
@@ -313,20 +355,12 @@ class TestDataIntegrity:
         
         for asset in sample_assets[:10]:  # Test first 10 assets
             date = asset['creation_date']
-            assert 'T' in date, f"Invalid date format (missing T): {date}"
-            assert date.endswith('Z'), f"Date should end with Z: {date}"
-            assert len(date) >= 20, f"Date too short: {date}"
+            assert ISO8601_UTC.match(date), f"Invalid ISO 8601 UTC date: {date}"
     
-    def test_metadata_consistency(self, image_assets, temp_export_dir):
+    def test_metadata_consistency(self, session_exported_asset):
         """Test metadata consistency between list and export"""
-        if not image_assets:
-            pytest.skip("No image assets available for metadata test")
-        
-        # Get asset from list
-        list_asset = image_assets[0]
-        
-        # Export same asset
-        export_result = run_swift_command(['export-asset', list_asset['id'], temp_export_dir])
+        # Asset from list and its (shared) export
+        list_asset, export_result = session_exported_asset
         export_metadata = export_result['metadata']
         
         # Compare consistent fields